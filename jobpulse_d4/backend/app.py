@@ -10,15 +10,50 @@ from flask import send_file
 import tempfile
 
 
+import gzip
 import requests
 from flask import Flask, request, jsonify, Response, render_template
+from flask.json.provider import DefaultJSONProvider
 from dotenv import load_dotenv
 from flask_cors import CORS
 
+# Optional speedups: orjson for large JSON payloads, brotli for response compression
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 # Load .env variables
 load_dotenv()
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify() through orjson; dates/Decimals still go through Flask's default() so output is unchanged."""
+    _OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.get("indent"):
+            return super().dumps(obj, **kwargs)
+        return self._dump_bytes(obj, kwargs.get("sort_keys", self.sort_keys)).decode()
+
+    def _dump_bytes(self, obj, sort_keys):
+        option = self._OPTIONS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def response(self, *args, **kwargs):
+        if self._app.debug:
+            return super().response(*args, **kwargs)  # keep pretty-printing in debug
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dump_bytes(obj, self.sort_keys), mimetype=self.mimetype)
+
+
 app = Flask(__name__, static_folder="static", template_folder="templates")
+if orjson:
+    app.json = OrjsonProvider(app)
 CORS(app, resources={r"/*": {"origins": "*"}})
 
 OCTOPARSE_API_TIER = "advanced"
@@ -94,6 +129,56 @@ def _handle_response(res: requests.Response):
     except Exception:
         return res.text, res.status_code
 
+def _requested_fields(allowed=None):
+    """
+    Parses ?fields=a,b,c. Returns None when absent; raises ValueError for names
+    outside `allowed` (if given).
+    """
+    raw = request.args.get("fields", "").strip()
+    if not raw:
+        return None
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    if allowed is not None:
+        bad = [f for f in fields if f not in allowed]
+        if bad:
+            raise ValueError(f"unknown fields: {', '.join(bad)}")
+    return fields or None
+
+def _project(items, fields):
+    """Keeps only `fields` in each Octoparse item (keys missing from an item are skipped)."""
+    if not fields:
+        return items
+    return [{k: it[k] for k in fields if k in it} for it in items]
+
+# --- Response compression ---
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+COMPRESS_MIMETYPES = {"application/json", "text/csv"}
+
+@app.after_request
+def compress_response(resp):
+    """gzip/brotli JSON and CSV bodies above COMPRESS_MIN_SIZE when the client accepts it."""
+    if (resp.direct_passthrough or resp.status_code != 200
+            or "Content-Encoding" in resp.headers
+            or resp.mimetype not in COMPRESS_MIMETYPES):
+        return resp
+    resp.vary.add("Accept-Encoding")
+    body = resp.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return resp
+
+    offers = ["br", "gzip"] if brotli else ["gzip"]
+    encoding = request.accept_encodings.best_match(offers)
+    if encoding == "br":
+        body = brotli.compress(body, quality=5)
+    elif encoding == "gzip":
+        body = gzip.compress(body, compresslevel=6)
+    else:
+        return resp
+
+    resp.set_data(body)
+    resp.headers["Content-Encoding"] = encoding
+    return resp
+
 # --- UI ---
 @app.get("/")
 def home():
@@ -191,23 +276,103 @@ def get_data_by_offset(task_id):
     offset = int(request.args.get("offset", 0))
     size = int(request.args.get("size", 100))
 
+    fields = _requested_fields()
+
     res = requests.get(
         f"{BASE_URL}/api/alldata/GetDataOfTaskByOffset",
         params={"taskId": task_id, "offset": offset, "size": size},
         headers=token_mgr.headers(),
         timeout=60,
     )
-    return _handle_response(res)
+    if res.status_code != 200 or not fields:
+        return _handle_response(res)
+
+    payload = res.json() or {}
+    data = payload.get("data") or {}
+    if "dataList" in data:
+        data["dataList"] = _project(data["dataList"] or [], fields)
+    return jsonify(payload)
 
 # --- NEW routes for D4 ---
 
+def _upsert_items(cur, items):
+    """Bulk upsert, falling back to row-by-row so one bad item doesn't drop the page."""
+    from db import upsert_job, upsert_jobs
+    try:
+        return upsert_jobs(cur, items)
+    except Exception as e:
+        print("BULK UPSERT ERROR:", e)
+    saved = 0
+    for j in items:
+        try:
+            upsert_job(cur, j)
+            saved += 1
+        except Exception as e:
+            print("UPSERT ERROR:", e)
+    return saved
+
+def _ingest_all(task_id, offset, size):
+    """Full-task ingest: Octoparse page fetchers and DB writers overlapped via ingest_pipeline."""
+    import threading
+    from db import get_conn
+    from ingest_pipeline import run_pipeline
+
+    if size < 1 or offset < 0:
+        return jsonify({"error": "size must be >= 1 and offset >= 0"}), 400
+
+    fetchers = max(1, min(int(request.args.get("fetchers", 2)), 8))
+    writers = max(1, min(int(request.args.get("writers", 1)), 8))
+    queue_size = max(1, min(int(request.args.get("queue", 8)), 64))
+    local = threading.local()
+    conns = []
+
+    def fetch_page(ofs, n):
+        res = requests.get(
+            f"{BASE_URL}/api/alldata/GetDataOfTaskByOffset",
+            params={"taskId": task_id, "offset": ofs, "size": n},
+            headers=token_mgr.headers(),
+            timeout=60,
+        )
+        if res.status_code != 200:
+            raise RuntimeError(f"HTTP {res.status_code}: {res.text[:200]}")
+        return (res.json() or {}).get("data", {}).get("dataList", []) or []
+
+    def write_batch(items):
+        if not hasattr(local, "conn"):
+            local.conn = get_conn()
+            conns.append(local.conn)
+        with local.conn.cursor() as cur:
+            return _upsert_items(cur, items)
+
+    try:
+        stats = run_pipeline(fetch_page, write_batch, size=size, offset=offset,
+                             fetchers=fetchers, writers=writers, queue_size=queue_size)
+    finally:
+        for c in conns:
+            c.close()
+    print("INGEST PIPELINE:", task_id, stats)
+    body = {"mode": "all", "complete": stats["complete"], "received": stats["fetch"]["rows"],
+            "upserted": stats["write"]["rows"], "offset": offset, "size": size, "stats": stats}
+    if not stats["complete"]:
+        # partial ingest: surface it like the single-page path surfaces upstream errors
+        body["error"] = "; ".join(stats["fetch"]["errors"] + stats["write"]["errors"])
+        return jsonify(body), 502
+    return jsonify(body)
+
 # 1) Ingest from Octoparse into DB (upsert)
 @app.post("/ingest/<task_id>")
 def ingest_task(task_id):
-    from db import get_conn, upsert_job
+    """
+    One page by default. Pass ?all=true to ingest the whole task through the
+    fetch/write pipeline (&fetchers=2&writers=1&queue=8 tune the stages).
+    """
+    from db import get_conn
     offset = int(request.args.get("offset", 0))
     size = int(request.args.get("size", 100))
 
+    if request.args.get("all", "false").lower() == "true":
+        return _ingest_all(task_id, offset, size)
+
     res = requests.get(
         f"{BASE_URL}/api/alldata/GetDataOfTaskByOffset",
         params={"taskId": task_id, "offset": offset, "size": size},
@@ -219,23 +384,20 @@ def ingest_task(task_id):
 
     data = res.json().get("data", {})
     items = data.get("dataList", [])
-    inserted = 0
 
     conn = get_conn()
     with conn.cursor() as cur:
-        for j in items:
-            try:
-                upsert_job(cur, j)
-                inserted += 1
-            except Exception as e:
-                print("UPSERT ERROR:", e)
+        inserted = _upsert_items(cur, items)
 
     return jsonify({"received": len(items), "upserted": inserted, "offset": offset, "size": size})
 
 # 2) Search (filters, sort, pagination)
-@app.get("/search")
-def search_jobs():
-    from db import get_conn
+def _search_query():
+    """
+    Builds the /search SELECT (without LIMIT) from the request args.
+    Returns (columns, sql, count_sql, args); raises ValueError for bad ?fields=.
+    """
+    from db import title_filter, JOB_COLUMNS
 
     q = request.args.get("q", "").strip()          # title contains
     geo = request.args.get("geo", "").strip()      # location contains
@@ -245,47 +407,73 @@ def search_jobs():
     end = request.args.get("end", "").strip()      # ISO date
     sort = request.args.get("sort", "post_time")   # post_time|title|company
     order = request.args.get("order", "desc")      # asc|desc
-    page = int(request.args.get("page", 1))
-    page_size = min(int(request.args.get("page_size", 25)), 100)
-    offset = (page - 1) * page_size
 
-    clauses, args = [], []
-
-    if q:
-        clauses.append("job_title LIKE %s")
-        args.append(f"%{q}%")
-    if geo:
-        clauses.append("job_location LIKE %s")
-        args.append(f"%{geo}%")
-    if emp:
-        clauses.append("employment_type = %s")
-        args.append(emp)
-    if senior:
-        clauses.append("seniority_level = %s")
-        args.append(senior)
-    if start:
-        clauses.append("post_time >= %s")
-        args.append(start)
-    if end:
-        clauses.append("post_time < %s")
-        args.append(end)
-
-    where_sql = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    include_archived = request.args.get("include_archived", "false").lower() == "true"
+    fields = _requested_fields(("id",) + JOB_COLUMNS)
+
+    def where_for(table):
+        clauses, args = [], []
+
+        if q:
+            clause, title_args = title_filter(q, table)
+            clauses.append(clause)
+            args.extend(title_args)
+        if geo:
+            clauses.append("job_location LIKE %s")
+            args.append(f"%{geo}%")
+        if emp:
+            clauses.append("employment_type = %s")
+            args.append(emp)
+        if senior:
+            clauses.append("seniority_level = %s")
+            args.append(senior)
+        if start:
+            clauses.append("post_time >= %s")
+            args.append(start)
+        if end:
+            clauses.append("post_time < %s")
+            args.append(end)
+
+        return (("WHERE " + " AND ".join(clauses)) if clauses else ""), args
+
     sort_col = {"post_time":"post_time","title":"job_title","company":"company"}.get(sort,"post_time")
+    select = fields or ["id", "job_title", "company", "job_location", "post_time", "job_link"]
+    cols = ", ".join(select)
+    where_sql, args = where_for("jobs")
+    source = "jobs"
+    if include_archived:
+        # hot + archived rows; filters are applied inside each branch so both can use their indexes
+        inner = cols if sort_col in select else f"{cols}, {sort_col}"
+        arch_sql, arch_args = where_for("jobs_archive")
+        # skip archived copies of postings that are live again in jobs
+        live = "NOT EXISTS (SELECT 1 FROM jobs h WHERE h.job_link = jobs_archive.job_link)"
+        arch_sql = f"{arch_sql} AND {live}" if arch_sql else f"WHERE {live}"
+        source = (f"(SELECT {inner} FROM jobs {where_sql} "
+                  f"UNION ALL SELECT {inner} FROM jobs_archive {arch_sql}) AS j")
+        where_sql, args = "", args + arch_args
+
     order_sql = "DESC" if order.lower()=="desc" else "ASC"
+    sql = f"SELECT {cols} FROM {source} {where_sql} ORDER BY {sort_col} {order_sql}"
+    return select, sql, f"SELECT COUNT(*) AS c FROM {source} {where_sql}", args
+
+@app.get("/search")
+def search_jobs():
+    from db import get_conn
+
+    page = int(request.args.get("page", 1))
+    page_size = min(int(request.args.get("page_size", 25)), 100)
+    offset = (page - 1) * page_size
+    try:
+        _, sql, count_sql, args = _search_query()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     conn = get_conn()
     with conn.cursor() as cur:
-        cur.execute(f"SELECT COUNT(*) AS c FROM jobs {where_sql}", args)
+        cur.execute(count_sql, args)
         total = cur.fetchone()["c"]
 
-        cur.execute(
-            f"""SELECT id, job_title, company, job_location, post_time, job_link
-                FROM jobs {where_sql}
-                ORDER BY {sort_col} {order_sql}
-                LIMIT %s OFFSET %s""",
-            args + [page_size, offset]
-        )
+        cur.execute(f"{sql} LIMIT %s OFFSET %s", args + [page_size, offset])
         rows = cur.fetchall()
 
     return jsonify({
@@ -295,20 +483,55 @@ def search_jobs():
         "items": rows
     })
 
-# 3) Export current page (CSV or JSON)
+def _export_parquet(ts):
+    """
+    Writes every row matching the /search filters (not just one page) to a
+    Parquet file with the jobs column types, one row group per DB batch.
+    """
+    from db import get_conn, stream_cursor
+    from parquet_export import JobsParquetWriter, MIMETYPE
+    try:
+        select, sql, _, args = _search_query()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    tmp = tempfile.TemporaryFile(suffix=".parquet")
+    writer = JobsParquetWriter(tmp, select)
+    conn = get_conn()
+    try:
+        with stream_cursor(conn) as cur:
+            cur.execute(sql, args)
+            while True:
+                rows = cur.fetchmany(writer.batch_rows)
+                if not rows:
+                    break
+                writer.write_rows(rows)
+    finally:
+        writer.close()
+        conn.close()
+    tmp.seek(0)
+    return send_file(tmp, mimetype=MIMETYPE, as_attachment=True,
+                     download_name=f"jobpulse_export_{ts}.parquet")
+
+# 3) Export (CSV and JSON: the current page; Parquet: all matching rows)
 @app.get("/export")
 def export_jobs():
     fmt = request.args.get("format","csv").lower()
+    ts = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+
+    if fmt == "parquet":
+        return _export_parquet(ts)
 
     # Reuse search logic by calling it internally
-    with app.test_request_context(query_string=request.query_string):
+    with app.test_request_context(query_string=request.query_string.decode()):
         data_resp = search_jobs()
         if isinstance(data_resp, tuple):
+            if data_resp[1] != 200:
+                return data_resp
             data = data_resp[0].json
         else:
             data = data_resp.json
 
-    ts = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
     rows = data.get("items", [])
 
     if fmt == "json":
@@ -337,6 +560,7 @@ def search_live():
     """
     Returns one page of Octoparse data directly (no DB required).
     Pass ?taskId=...&offset=0&size=50&save=true to also store in DB.
+    &fields=title,jobUrl,... trims the returned items (saving still uses the full items).
     """
     task_id = request.args.get("taskId")
     if not task_id:
@@ -344,6 +568,7 @@ def search_live():
     offset = int(request.args.get("offset", 0))
     size = int(request.args.get("size", 50))
     save = request.args.get("save", "false").lower() == "true"
+    fields = _requested_fields()
 
     res = requests.get(
         f"{BASE_URL}/api/alldata/GetDataOfTaskByOffset",
@@ -359,19 +584,13 @@ def search_live():
     items = data.get("dataList", [])
 
     if save and items:
-        from db import get_conn, upsert_job
+        from db import get_conn
         conn = get_conn()
-        saved = 0
         with conn.cursor() as cur:
-            for j in items:
-                try:
-                    upsert_job(cur, j)
-                    saved += 1
-                except Exception as e:
-                    print("UPSERT ERROR:", e)
-        return jsonify({"mode":"live", "received": len(items), "saved": saved, "items": items})
+            saved = _upsert_items(cur, items)
+        return jsonify({"mode":"live", "received": len(items), "saved": saved, "items": _project(items, fields)})
 
-    return jsonify({"mode":"live", "received": len(items), "items": items})
+    return jsonify({"mode":"live", "received": len(items), "items": _project(items, fields)})
 
 def _octo_get(path, params=None):
     res = requests.get(f"{BASE_URL}{path}", params=params, headers=token_mgr.headers(), timeout=60)
@@ -424,11 +643,93 @@ def wait_for_tasks(task_ids):
         time.sleep(5)  # respect 1 request / 5 seconds limit
 
 
+def _iter_task_pages(tid, offset, size):
+    """
+    Yields a task's dataList pages from Octoparse by offset paging until a short/empty page.
+    Raises RuntimeError if Octoparse answers a page with an error.
+    """
+    ofs = offset
+    while True:
+        data_res = _octo_get("/api/alldata/GetDataOfTaskByOffset", params={"taskId": tid, "offset": ofs, "size": size})
+        if data_res.status_code != 200:
+            raise RuntimeError(f"offset {ofs}: HTTP {data_res.status_code}: {data_res.text[:200]}")
+        payload = data_res.json() or {}
+        data = payload.get("data", {})
+        items = data.get("dataList", []) or []
+        if not items:
+            return
+        yield items
+        ofs += len(items)
+        if len(items) < size:
+            return  # reached the end
+
+def _safe_task_title(t, idx):
+    tname = t.get("taskName") or f"Task_{idx+1}"
+    # ensure a safe sheet title (max 31 chars, no []:*?/ etc.)
+    safe_title = "".join(c for c in tname if c not in '[]:*?/\\').strip()
+    if len(safe_title) == 0:
+        safe_title = f"Task_{idx+1}"
+    return safe_title[:31]
+
+def _zip_snapshot(snapshot_id, download_name):
+    """Streams a snapshot directory as a .zip (stored: Parquet is already compressed)."""
+    import zipfile
+    from parquet_export import snapshot_path
+    path = snapshot_path(snapshot_id)
+    # Anonymous temp file: removed by the OS as soon as send_file closes it, so
+    # repeated downloads don't leave copies of the snapshot behind.
+    tmp = tempfile.TemporaryFile(suffix=".zip")
+    with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_STORED) as zf:
+        for name in sorted(os.listdir(path)):
+            zf.write(os.path.join(path, name), arcname=f"{snapshot_id}/{name}")
+    tmp.seek(0)
+    return send_file(tmp, mimetype="application/zip", as_attachment=True, download_name=download_name)
+
+def _run_all_parquet(task_group_id, tasks, offset, size):
+    """Streams each task into its own Parquet file in a new snapshot, then returns it zipped."""
+    from parquet_export import TaskParquetWriter, new_snapshot, write_manifest
+    snapshot_id, path = new_snapshot(task_group_id)
+    manifest = {"snapshot_id": snapshot_id, "task_group_id": task_group_id,
+                "created_at": datetime.utcnow().isoformat() + "Z", "tasks": []}
+    used = set()
+
+    for idx, t in enumerate(tasks):
+        tid = t.get("taskId")
+        # dedupe on the final file name: "Jobs A" and "Jobs_A" both become Jobs_A
+        base = _safe_task_title(t, idx).replace(" ", "_")
+        fname, n = base, idx + 1
+        while fname.lower() in used:
+            fname = f"{base}_{n}"
+            n += 1
+        used.add(fname.lower())
+        fname += ".parquet"
+
+        writer = TaskParquetWriter(os.path.join(path, fname),
+                                   default_headers=["id", "title", "companyName", "location", "jobUrl"])
+        entry = {"taskId": tid, "taskName": t.get("taskName"), "file": fname, "complete": True}
+        try:
+            for items in _iter_task_pages(tid, offset, size):
+                writer.write_page(items)
+        except Exception as e:
+            # keep the pages written so far, but mark the file as partial
+            print("Data fetch error:", tid, e)
+            entry.update(complete=False, error=str(e))
+        finally:
+            writer.close()
+        entry.update(rows=writer.rows, columns=writer.headers, dropped_columns=writer.dropped_columns)
+        manifest["tasks"].append(entry)
+
+    manifest["complete"] = all(t["complete"] for t in manifest["tasks"])
+    write_manifest(path, manifest)
+    return _zip_snapshot(snapshot_id, f"jobpulse_octoparse_tasks_{snapshot_id}.zip")
+
 @app.post("/octo/run-all")
 def octo_run_all():
     """
-    Body JSON: { "taskGroupId": 12345, "offset": 0, "size": 100, "waitSeconds": 20, "selectedTaskIds": [..](optional) }
+    Body JSON: { "taskGroupId": 12345, "offset": 0, "size": 100, "waitSeconds": 20, "selectedTaskIds": [..](optional),
+                 "format": "xlsx" | "parquet" (optional, default xlsx) }
     Action: Start tasks, poll briefly (best-effort), retrieve data by offset, aggregate and return Excel.
+    With format=parquet each task is streamed to Parquet in a saved snapshot (see /snapshots) returned as a .zip.
     """
     body = request.get_json() or {}
     task_group_id = body.get("taskGroupId")
@@ -464,6 +765,9 @@ def octo_run_all():
     print("Polling until all tasks are complete...")
     wait_for_tasks(task_ids)
 
+    if str(body.get("format", "xlsx")).lower() == "parquet":
+        return _run_all_parquet(task_group_id, tasks, offset, size)
+
     # 4) fetch data per task by offset paging
     #    We'll build an Excel workbook with one sheet per taskName.
     wb = Workbook()
@@ -472,30 +776,15 @@ def octo_run_all():
 
     for idx, t in enumerate(tasks):
         tid = t.get("taskId")
-        tname = t.get("taskName") or f"Task_{idx+1}"
-        # ensure a safe sheet title (max 31 chars, no []:*?/ etc.)
-        safe_title = "".join(c for c in tname if c not in '[]:*?/\\').strip()
-        if len(safe_title) == 0:
-            safe_title = f"Task_{idx+1}"
-        safe_title = safe_title[:31]
+        safe_title = _safe_task_title(t, idx)
 
         # accumulate rows (dicts) for this task
         all_rows = []
-        ofs = offset
-        while True:
-            data_res = _octo_get("/api/alldata/GetDataOfTaskByOffset", params={"taskId": tid, "offset": ofs, "size": size})
-            if data_res.status_code != 200:
-                print("Data fetch error:", tid, data_res.text)
-                break
-            payload = data_res.json() or {}
-            data = payload.get("data", {})
-            items = data.get("dataList", []) or []
-            if not items:
-                break
-            all_rows.extend(items)
-            ofs += len(items)
-            if len(items) < size:
-                break  # reached the end
+        try:
+            for items in _iter_task_pages(tid, offset, size):
+                all_rows.extend(items)
+        except Exception as e:
+            print("Data fetch error:", tid, e)
 
         # write to sheet
         if not default_sheet_used:
@@ -534,5 +823,48 @@ def octo_run_all():
             pass
 
 
+@app.get("/snapshots")
+def list_snapshots_route():
+    """Saved run-all Parquet snapshots (newest first)."""
+    from parquet_export import list_snapshots
+    return jsonify({"snapshots": list_snapshots()})
+
+@app.get("/snapshots/<snapshot_id>")
+def get_snapshot(snapshot_id):
+    """
+    Re-serves a snapshot without calling Octoparse.
+    No params: the whole snapshot as .zip. ?taskId=...: that task's .parquet file,
+    or its rows as JSON with &format=json (&offset=0&size=100 to page, &fields= to project).
+    """
+    from parquet_export import read_manifest, snapshot_path, read_task_rows, MIMETYPE
+    manifest = read_manifest(snapshot_id)
+    if not manifest:
+        return jsonify({"error": "snapshot not found"}), 404
+
+    task_id = request.args.get("taskId")
+    if not task_id:
+        return _zip_snapshot(snapshot_id, f"jobpulse_octoparse_tasks_{snapshot_id}.zip")
+
+    task = next((t for t in manifest["tasks"] if str(t["taskId"]) == task_id), None)
+    if not task:
+        return jsonify({"error": "task not in snapshot"}), 404
+
+    if request.args.get("format", "parquet").lower() == "json":
+        offset = int(request.args.get("offset", 0))
+        size = int(request.args.get("size", 100))
+        if offset < 0 or size < 0:
+            return jsonify({"error": "offset and size must be >= 0"}), 400
+        items = read_task_rows(snapshot_id, task["file"], offset, size)
+        return jsonify({"snapshot_id": snapshot_id, "taskId": task["taskId"], "total": task["rows"],
+                        "offset": offset, "size": size, "items": _project(items, _requested_fields())})
+
+    return send_file(os.path.join(snapshot_path(snapshot_id), task["file"]),
+                     mimetype=MIMETYPE, as_attachment=True, download_name=task["file"])
+
+
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=1112)
+    retention_hours = float(os.getenv("RETENTION_INTERVAL_HOURS", 0))
+    if retention_hours > 0:
+        from retention import start_scheduler
+        start_scheduler(retention_hours)
+    app.run(host="0.0.0.0", port=int(os.getenv("PORT", 1112)))
@@ -0,0 +1,252 @@
+"""
+Offline bulk loader for Octoparse exports (xlsx / csv / json / jsonl) and historical backfills.
+
+Rows are streamed from each file, normalized with the same mapping upsert_job uses
+(db.job_params), loaded into a temporary staging table in chunks and folded into
+`jobs` with one set-based upsert per chunk. Progress is checkpointed after every
+merged chunk, so a re-run resumes where the previous one stopped. A chunk that
+fails as a whole is retried row by row; rows the DB still rejects are logged
+and counted as skipped.
+
+Usage (from backend/, same DB_* / DB_BACKEND env as the app):
+    python bulk_load.py exports/*.xlsx backfill/2024-*.csv
+    python bulk_load.py --load-data --chunk-size 50000 big_export.csv
+    python bulk_load.py --restart old.json           # ignore the checkpoint
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import db
+
+DEFAULT_CHECKPOINT = ".bulk_load.checkpoint.json"
+
+
+def _positive_int(value):
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return n
+
+
+# --- Readers: each yields Octoparse-style dicts, one per source row ---
+def _clean(row):
+    # Exports use "" for missing cells; treat them as NULL like the API does.
+    return {k: (None if v == "" else v) for k, v in row.items() if k}
+
+
+def _read_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            yield _clean(row)
+
+
+def _read_xlsx(path):
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        # run-all exports have one sheet per task, each with its own header row
+        for ws in wb.worksheets:
+            rows = ws.iter_rows(values_only=True)
+            headers = next(rows, None)
+            if not headers:
+                continue
+            headers = [str(h) if h is not None else None for h in headers]
+            for values in rows:
+                yield _clean(dict(zip(headers, values)))
+    finally:
+        wb.close()
+
+
+def _read_json(path):
+    if path.lower().endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield _clean(json.loads(line))
+        return
+
+    with open(path, encoding="utf-8") as f:
+        payload = json.load(f)
+    # Accept a bare list, a saved API response ({"data": {"dataList": [...]}}) or {"dataList": [...]}
+    if isinstance(payload, dict):
+        payload = (payload.get("data") or payload).get("dataList", [])
+    for row in payload or []:
+        yield _clean(row)
+
+
+READERS = {
+    ".csv": _read_csv,
+    ".xlsx": _read_xlsx,
+    ".json": _read_json,
+    ".jsonl": _read_json,
+    ".ndjson": _read_json,
+}
+
+
+# --- Checkpointing ---
+def _file_key(path):
+    st = os.stat(path)
+    return f"{os.path.abspath(path)}:{st.st_size}:{int(st.st_mtime)}"
+
+
+def _load_checkpoint(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_checkpoint(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+# --- Staging loaders ---
+def _tsv_value(v):
+    if v is None:
+        return "\\N"
+    return (str(v).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def _stage_load_data(cur, rows):
+    """MySQL fast path: spool the chunk to a TSV and LOAD DATA LOCAL INFILE it."""
+    with tempfile.NamedTemporaryFile("w", suffix=".tsv", encoding="utf-8", newline="\n", delete=False) as f:
+        for r in rows:
+            f.write("\t".join(_tsv_value(v) for v in r))
+            f.write("\n")
+    try:
+        cur.execute(
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {db.STAGING_TABLE} CHARACTER SET utf8mb4 "
+            f"({', '.join(db.JOB_COLUMNS)})",
+            (f.name,),
+        )
+    finally:
+        os.unlink(f.name)
+
+
+def _flush(cur, rows, load_data):
+    if load_data:
+        _stage_load_data(cur, rows)
+    else:
+        db.stage_rows(cur, rows)
+    db.merge_staging(cur)
+
+
+def _flush_rows(cur, path, chunk):
+    """
+    Row-by-row fallback for a chunk whose set-based load failed (e.g. one value
+    rejected by MySQL strict mode). Returns (loaded, rejected); rejects are logged.
+    """
+    db.clear_staging(cur)  # drop whatever part of the chunk made it into staging
+    loaded = rejected = 0
+    for rownum, params in chunk:
+        try:
+            db.upsert_params(cur, params)
+            loaded += 1
+        except Exception as e:
+            rejected += 1
+            print(f"{path}: row {rownum} rejected: {e}", file=sys.stderr)
+    return loaded, rejected
+
+
+def load_file(cur, path, state, checkpoint, chunk_size, load_data):
+    key = _file_key(path)
+    entry = state.get(key, {})
+    if entry.get("done"):
+        print(f"{path}: already loaded ({entry.get('rows', 0)} rows), skipping", file=sys.stderr)
+        return 0
+
+    reader = READERS[os.path.splitext(path)[1].lower()]
+    skip = entry.get("rows", 0)
+    if skip:
+        print(f"{path}: resuming after row {skip}", file=sys.stderr)
+
+    consumed, loaded, skipped = skip, 0, entry.get("skipped", 0)
+    chunk = []
+    started = time.time()
+
+    def commit():
+        nonlocal chunk, loaded, skipped
+        if chunk:
+            try:
+                _flush(cur, [params for _, params in chunk], load_data)
+                loaded += len(chunk)
+            except Exception as e:
+                print(f"{path}: chunk load failed ({e}); retrying row by row", file=sys.stderr)
+                ok, rejected = _flush_rows(cur, path, chunk)
+                loaded += ok
+                skipped += rejected
+            chunk = []
+        state[key] = {"rows": consumed, "skipped": skipped}
+        _save_checkpoint(checkpoint, state)
+        elapsed = max(time.time() - started, 1e-6)
+        print(f"{path}: {consumed} rows read, {loaded} loaded this run "
+              f"({loaded / elapsed:,.0f} rows/s)", file=sys.stderr)
+
+    for i, item in enumerate(reader(path)):
+        if i < skip:
+            continue
+        consumed += 1
+        params = db.job_params(item)
+        if not params[0]:
+            # job_title is NOT NULL in jobs; upsert_job would reject this row too
+            skipped += 1
+        else:
+            chunk.append((i + 1, params))
+        if consumed % chunk_size == 0:
+            commit()
+
+    commit()
+    state[key] = {"rows": consumed, "skipped": skipped, "done": True}
+    _save_checkpoint(checkpoint, state)
+    return loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load Octoparse exports into the jobs table.")
+    parser.add_argument("files", nargs="+", help="xlsx / csv / json / jsonl files")
+    parser.add_argument("--chunk-size", type=_positive_int, default=20000,
+                        help="rows per staging load + merge (and per checkpoint)")
+    parser.add_argument("--load-data", action="store_true",
+                        help="MySQL only: stage chunks with LOAD DATA LOCAL INFILE instead of batched INSERTs")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="resume state file")
+    parser.add_argument("--restart", action="store_true", help="ignore any existing checkpoint")
+    args = parser.parse_args(argv)
+
+    for path in args.files:
+        if os.path.splitext(path)[1].lower() not in READERS:
+            parser.error(f"unsupported file type: {path}")
+    if args.load_data and db.is_sqlite():
+        parser.error("--load-data needs the MySQL backend")
+
+    state = {} if args.restart else _load_checkpoint(args.checkpoint)
+    conn = db.get_conn(local_infile=args.load_data)
+    started = time.time()
+    total = 0
+    try:
+        with conn.cursor() as cur:
+            db.create_staging(cur)
+            for path in args.files:
+                total += load_file(cur, path, state, args.checkpoint, args.chunk_size, args.load_data)
+    finally:
+        conn.close()
+
+    elapsed = max(time.time() - started, 1e-6)
+    print(f"Done: {total} rows loaded in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
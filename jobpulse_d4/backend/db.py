@@ -1,6 +1,41 @@
-import os, pymysql
+import os, re, sqlite3
+from datetime import datetime
 
-def get_conn():
+# Storage backend: "mysql" (default, pymysql against a MySQL server) or
+# "sqlite" (embedded file, WAL mode + FTS5 trigram index) for single-node installs.
+DB_BACKEND = os.getenv("DB_BACKEND", "mysql").strip().lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join(os.path.dirname(__file__), "jobpulse.db"))
+SQLITE_SCHEMA = os.path.join(os.path.dirname(__file__), "schema_sqlite.sql")
+
+JOB_COLUMNS = (
+    "job_title", "job_link", "company", "company_link", "job_location", "post_time",
+    "applicant_count", "job_description", "industry", "employment_type", "valid_through",
+    "seniority_level", "job_function", "hiring_person", "min_pay", "max_pay",
+)
+
+# Columns refreshed when an existing job_link is seen again.
+JOB_UPDATE_COLUMNS = (
+    "job_title", "company", "job_location", "post_time", "applicant_count",
+    "job_description", "industry", "employment_type", "seniority_level",
+    "job_function", "min_pay", "max_pay",
+)
+
+
+def _now():
+    # UTC, like the cutoffs retention.py compares last_seen against
+    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def is_sqlite():
+    return DB_BACKEND == "sqlite"
+
+
+def get_conn(local_infile=False):
+    """local_infile enables LOAD DATA LOCAL INFILE (MySQL only; used by bulk_load.py)."""
+    if is_sqlite():
+        return _sqlite_conn()
+
+    import pymysql
     return pymysql.connect(
         host=os.getenv("DB_HOST","127.0.0.1"),
         user=os.getenv("DB_USER","root"),
@@ -8,34 +43,125 @@ def get_conn():
         database=os.getenv("DB_NAME","jobpulse"),
         charset="utf8mb4",
         cursorclass=pymysql.cursors.DictCursor,
-        autocommit=True
+        autocommit=True,
+        local_infile=local_infile
     )
 
-def upsert_job(cur, j):
+
+def stream_cursor(conn):
     """
-    Accepts an Octoparse item 'j' (dataList element) and upserts into jobs.
-    We normalize common Octoparse fields into our schema.
+    Cursor for reading a large result with fetchmany(): unbuffered on MySQL
+    (rows stay on the server until fetched); SQLite cursors already step lazily.
     """
-    sql = """
-    INSERT INTO jobs (job_title, job_link, company, company_link, job_location, post_time,
-                      applicant_count, job_description, industry, employment_type, valid_through,
-                      seniority_level, job_function, hiring_person, min_pay, max_pay)
-    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-    ON DUPLICATE KEY UPDATE
-      job_title=VALUES(job_title),
-      company=VALUES(company),
-      job_location=VALUES(job_location),
-      post_time=VALUES(post_time),
-      applicant_count=VALUES(applicant_count),
-      job_description=VALUES(job_description),
-      industry=VALUES(industry),
-      employment_type=VALUES(employment_type),
-      seniority_level=VALUES(seniority_level),
-      job_function=VALUES(job_function),
-      min_pay=VALUES(min_pay),
-      max_pay=VALUES(max_pay)
-    """
-    cur.execute(sql, (
+    if is_sqlite():
+        return conn.cursor()
+    import pymysql
+    return conn.cursor(pymysql.cursors.SSDictCursor)
+
+
+# --- SQLite backend ---
+_sqlite_ready = set()
+
+def _dict_row(cursor, row):
+    return {d[0]: v for d, v in zip(cursor.description, row)}
+
+
+class _SqliteCursor:
+    """
+    Minimal DB-API shim so callers can keep pymysql-style code:
+    '%s' placeholders, dict rows and `with conn.cursor() as cur:`.
+    """
+    _PLACEHOLDER = re.compile(r"%s")
+
+    def __init__(self, cur):
+        self._cur = cur
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cur.close()
+
+    def execute(self, sql, args=()):
+        return self._cur.execute(self._PLACEHOLDER.sub("?", sql), tuple(args or ()))
+
+    def executemany(self, sql, seq):
+        return self._cur.executemany(self._PLACEHOLDER.sub("?", sql), seq)
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    def fetchmany(self, size):
+        return self._cur.fetchmany(size)
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+
+class _SqliteConn:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self):
+        return _SqliteCursor(self._conn.cursor())
+
+    def close(self):
+        self._conn.close()
+
+
+def _sqlite_add_last_seen(conn):
+    """Adds jobs/jobs_archive.last_seen to databases created before it existed."""
+    for table in ("jobs", "jobs_archive"):
+        cols = [r["name"] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+        if cols and "last_seen" not in cols:
+            # ADD COLUMN can't take a CURRENT_TIMESTAMP default; backfill instead
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN last_seen DATETIME")
+            conn.execute(f"UPDATE {table} SET last_seen = CURRENT_TIMESTAMP")
+
+
+def _sqlite_conn():
+    # isolation_level=None gives autocommit, matching the MySQL connection.
+    conn = sqlite3.connect(SQLITE_PATH, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.row_factory = _dict_row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    if SQLITE_PATH not in _sqlite_ready:
+        _sqlite_add_last_seen(conn)
+        had_index = conn.execute(
+            "SELECT 1 AS x FROM sqlite_master WHERE type='table' AND name='jobs_trgm'").fetchone()
+        with open(SQLITE_SCHEMA, encoding="utf-8") as f:
+            conn.executescript(f.read())
+        if not had_index:
+            # new (or upgraded) database: index the rows that already exist
+            conn.execute("INSERT INTO jobs_trgm (jobs_trgm) VALUES ('rebuild')")
+        _sqlite_ready.add(SQLITE_PATH)
+    return _SqliteConn(conn)
+
+
+def title_filter(q, table="jobs"):
+    """
+    Returns (clause, args) for the /search title filter on `table`. The match
+    itself is always `job_title LIKE '%q%'`, on every backend and table, so the
+    hot and archive branches of an include_archived search agree. On SQLite the
+    jobs table adds the trigram index as a candidate pre-filter (terms of 3+
+    characters; shorter ones can't use trigrams).
+    """
+    pattern = f"%{q}%"
+    if is_sqlite() and table == "jobs" and len(q) >= 3:
+        return ("job_title LIKE %s AND id IN (SELECT rowid FROM jobs_trgm WHERE job_title LIKE %s)",
+                [pattern, pattern])
+    return "job_title LIKE %s", [pattern]
+
+
+# --- Upserts ---
+def job_params(j):
+    """Normalize an Octoparse item 'j' (dataList element) into a JOB_COLUMNS tuple."""
+    return (
         j.get("title") or j.get("jobTitle") or j.get("JobTitle"),
         j.get("jobUrl") or j.get("job_link"),
         j.get("companyName") or j.get("company"),
@@ -54,4 +180,115 @@ def upsert_job(cur, j):
         j.get("posterFullName") or j.get("hiring_person"),
         j.get("min_pay"),
         j.get("max_pay"),
-    ))
+    )
+
+
+def _upsert_sql():
+    # last_seen is bound as a parameter (not CURRENT_TIMESTAMP) so VALUES stays
+    # all-placeholders and pymysql can still batch executemany into one INSERT.
+    cols = ", ".join(JOB_COLUMNS + ("last_seen",))
+    marks = ",".join(["%s"] * (len(JOB_COLUMNS) + 1))
+    if is_sqlite():
+        updates = ",\n      ".join(f"{c}=excluded.{c}" for c in JOB_UPDATE_COLUMNS + ("last_seen",))
+        return f"""
+    INSERT INTO jobs ({cols})
+    VALUES ({marks})
+    ON CONFLICT(job_link) DO UPDATE SET
+      {updates}
+    """
+    updates = ",\n      ".join(f"{c}=VALUES({c})" for c in JOB_UPDATE_COLUMNS + ("last_seen",))
+    return f"""
+    INSERT INTO jobs ({cols})
+    VALUES ({marks})
+    ON DUPLICATE KEY UPDATE
+      {updates}
+    """
+
+
+def upsert_job(cur, j):
+    """
+    Accepts an Octoparse item 'j' (dataList element) and upserts into jobs.
+    We normalize common Octoparse fields into our schema.
+    """
+    upsert_params(cur, job_params(j))
+
+
+def upsert_params(cur, params):
+    """upsert_job for a row that is already a JOB_COLUMNS tuple (see job_params)."""
+    cur.execute(_upsert_sql(), tuple(params) + (_now(),))
+
+
+def upsert_jobs(cur, items):
+    """
+    Bulk variant of upsert_job: one prepared statement for the whole batch
+    (pymysql rewrites it into a multi-row INSERT; SQLite runs it in one transaction).
+    Returns the number of rows sent.
+    """
+    now = _now()
+    rows = [job_params(j) + (now,) for j in items]
+    if not rows:
+        return 0
+    if is_sqlite():
+        cur.execute("BEGIN")
+        try:
+            cur.executemany(_upsert_sql(), rows)
+        except Exception:
+            cur.execute("ROLLBACK")
+            raise
+        cur.execute("COMMIT")
+    else:
+        cur.executemany(_upsert_sql(), rows)
+    return len(rows)
+
+
+# --- Staging (bulk loads) ---
+STAGING_TABLE = "jobs_staging"
+
+def clear_staging(cur):
+    cur.execute(f"DELETE FROM {STAGING_TABLE}")
+
+
+def create_staging(cur):
+    """
+    Creates an empty, index-free per-connection temp table with the jobs column types.
+    Rows are loaded here first, then folded into jobs by merge_staging().
+    """
+    cols = ", ".join(JOB_COLUMNS)
+    cur.execute(f"CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} AS SELECT {cols} FROM jobs WHERE 1=0")
+    cur.execute(f"DELETE FROM {STAGING_TABLE}")
+
+
+def stage_rows(cur, rows):
+    """Batched insert of JOB_COLUMNS tuples into the staging table."""
+    cols = ", ".join(JOB_COLUMNS)
+    marks = ",".join(["%s"] * len(JOB_COLUMNS))
+    cur.executemany(f"INSERT INTO {STAGING_TABLE} ({cols}) VALUES ({marks})", rows)
+
+
+def merge_staging(cur):
+    """Set-based upsert of the whole staging table into jobs, then empties staging."""
+    cols = ", ".join(JOB_COLUMNS)
+    now = (_now(),)
+    if is_sqlite():
+        updates = ", ".join(f"{c}=excluded.{c}" for c in JOB_UPDATE_COLUMNS + ("last_seen",))
+        # 'WHERE true' disambiguates the upsert clause from a join constraint
+        cur.execute("BEGIN")
+        try:
+            cur.execute(
+                f"INSERT INTO jobs ({cols}, last_seen) SELECT {cols}, %s FROM {STAGING_TABLE} WHERE true "
+                f"ON CONFLICT(job_link) DO UPDATE SET {updates}",
+                now,
+            )
+            cur.execute(f"DELETE FROM {STAGING_TABLE}")
+        except Exception:
+            cur.execute("ROLLBACK")
+            raise
+        cur.execute("COMMIT")
+        return
+    updates = ", ".join(f"{c}=VALUES({c})" for c in JOB_UPDATE_COLUMNS + ("last_seen",))
+    cur.execute(
+        f"INSERT INTO jobs ({cols}, last_seen) SELECT {cols}, %s FROM {STAGING_TABLE} "
+        f"ON DUPLICATE KEY UPDATE {updates}",
+        now,
+    )
+    cur.execute(f"DELETE FROM {STAGING_TABLE}")
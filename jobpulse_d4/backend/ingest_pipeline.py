@@ -0,0 +1,136 @@
+"""
+Producer/consumer pipeline for full-task ingest.
+
+Fetcher threads page through Octoparse and put `dataList` batches on a bounded
+queue; writer threads drain it into the DB. The bounded queue gives backpressure
+(fetchers block when writers fall behind), so end-to-end time tracks the slower
+stage rather than fetch + write.
+"""
+import queue
+import threading
+import time
+
+
+class _StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.rows = 0
+        self.busy = 0.0      # seconds doing the stage's own work
+        self.blocked = 0.0   # seconds waiting on the queue (full for fetchers, empty for writers)
+        self.errors = []
+
+    def add(self, rows, busy, blocked):
+        with self.lock:
+            self.batches += 1
+            self.rows += rows
+            self.busy += busy
+            self.blocked += blocked
+
+    def error(self, msg):
+        with self.lock:
+            self.errors.append(msg)
+
+    def as_dict(self):
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "busy_seconds": round(self.busy, 3),
+            "blocked_seconds": round(self.blocked, 3),
+            "rows_per_sec": round(self.rows / self.busy, 1) if self.busy else None,
+            "errors": self.errors,
+        }
+
+
+def run_pipeline(fetch_page, write_batch, size=1000, offset=0, fetchers=2, writers=1, queue_size=8):
+    """
+    fetch_page(offset, size) -> list of items ([] at the end); raises on failure.
+    write_batch(items) -> number of rows written; called from writer threads, so it
+        should keep one DB connection per thread.
+
+    Fetcher k requests pages k, k+fetchers, k+2*fetchers, ... and stops at the first
+    short or empty page. The first fetch or write error stops every fetcher, so no
+    new pages are requested after a failure. Pages already fetched or in flight
+    (including ones past a failed page) are still written, so a failed run can
+    have gaps. Returns a stats dict with per-stage throughput, queue depth and
+    `complete` (False if any fetch or write failed).
+    """
+    if size < 1:
+        raise ValueError("size must be >= 1")
+    q = queue.Queue(maxsize=max(1, queue_size))
+    fetch_stats = _StageStats("fetch")
+    write_stats = _StageStats("write")
+    depth = {"max": 0, "sum": 0, "samples": 0}
+    depth_lock = threading.Lock()
+    stop = threading.Event()
+
+    def sample_depth():
+        d = q.qsize()
+        with depth_lock:
+            depth["max"] = max(depth["max"], d)
+            depth["sum"] += d
+            depth["samples"] += 1
+
+    def fetcher(k):
+        page = k
+        while not stop.is_set():
+            ofs = offset + page * size
+            t0 = time.perf_counter()
+            try:
+                items = fetch_page(ofs, size)
+            except Exception as e:
+                fetch_stats.error(f"offset {ofs}: {e}")
+                stop.set()
+                return
+            t1 = time.perf_counter()
+            if items:
+                q.put(items)  # blocks while the queue is full
+                sample_depth()
+            fetch_stats.add(len(items), t1 - t0, time.perf_counter() - t1)
+            if not items or len(items) < size:
+                return
+            page += fetchers
+
+    def writer():
+        while True:
+            t0 = time.perf_counter()
+            items = q.get()
+            t1 = time.perf_counter()
+            if items is None:
+                return
+            try:
+                written = write_batch(items)
+            except Exception as e:
+                write_stats.error(str(e))
+                stop.set()  # no point fetching more pages the DB can't take
+                written = 0
+            write_stats.add(written, time.perf_counter() - t1, t1 - t0)
+
+    started = time.perf_counter()
+    fetch_threads = [threading.Thread(target=fetcher, args=(k,), daemon=True) for k in range(max(1, fetchers))]
+    write_threads = [threading.Thread(target=writer, daemon=True) for _ in range(max(1, writers))]
+    for t in fetch_threads + write_threads:
+        t.start()
+    for t in fetch_threads:
+        t.join()
+    for _ in write_threads:
+        q.put(None)
+    for t in write_threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "complete": not (fetch_stats.errors or write_stats.errors),
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_sec": round(write_stats.rows / elapsed, 1) if elapsed else None,
+        "fetchers": len(fetch_threads),
+        "writers": len(write_threads),
+        "fetch": fetch_stats.as_dict(),
+        "write": write_stats.as_dict(),
+        "queue": {
+            "size": q.maxsize,
+            "max_depth": depth["max"],
+            "avg_depth": round(depth["sum"] / depth["samples"], 2) if depth["samples"] else 0,
+        },
+    }
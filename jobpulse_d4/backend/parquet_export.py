@@ -0,0 +1,227 @@
+"""
+Parquet export and on-disk snapshots.
+
+run-all results are streamed into one Parquet file per task (one row group per
+Octoparse page) under SNAPSHOT_DIR/<snapshot_id>/, next to a manifest.json.
+A snapshot can be downloaded again or read back by the app without calling
+Octoparse. pyarrow is imported lazily so the rest of the app runs without it.
+"""
+import json
+import os
+import re
+import uuid
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", os.path.join(os.path.dirname(__file__), "snapshots"))
+PARQUET_COMPRESSION = os.getenv("PARQUET_COMPRESSION", "zstd")
+PARQUET_SCHEMA_PAGES = max(1, int(os.getenv("PARQUET_SCHEMA_PAGES", 5)))
+MIMETYPE = "application/vnd.apache.parquet"
+
+_SNAPSHOT_ID = re.compile(r"^[\w.-]+$")
+
+
+def _cell(v):
+    # Octoparse values are text; anything else (numbers, nested values) is stringified.
+    if v is None or isinstance(v, str):
+        return v
+    if isinstance(v, (dict, list)):
+        return json.dumps(v, ensure_ascii=False)
+    return str(v)
+
+
+class TaskParquetWriter:
+    """
+    Streams Octoparse dataList pages into one Parquet file (all string columns).
+    The first PARQUET_SCHEMA_PAGES pages are buffered and the schema is the union
+    of their keys, in first-seen order. Parquet can't add columns later, so a key
+    that first appears after that is not written: it is logged and listed in
+    `dropped_columns` (the XLSX export would include it).
+    """
+
+    def __init__(self, path, default_headers=None):
+        self.path = path
+        self.default_headers = default_headers or []
+        self.headers = None
+        self.dropped_columns = []
+        self.rows = 0
+        self._pending = []
+        self._writer = None
+        self._schema = None
+
+    def _open(self, headers):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.headers = headers
+        self._schema = pa.schema([(h, pa.string()) for h in headers])
+        self._writer = pq.ParquetWriter(self.path, self._schema, compression=PARQUET_COMPRESSION)
+
+    def _write(self, items):
+        import pyarrow as pa
+        known = set(self.headers)
+        extra = [k for it in items for k in it.keys() if k not in known and k not in self.dropped_columns]
+        for k in dict.fromkeys(extra):
+            print(f"PARQUET WARNING: {os.path.basename(self.path)}: column '{k}' first seen "
+                  f"after the schema was fixed; not written")
+            self.dropped_columns.append(k)
+        columns = {h: [_cell(it.get(h)) for it in items] for h in self.headers}
+        self._writer.write_table(pa.Table.from_pydict(columns, schema=self._schema))
+        self.rows += len(items)
+
+    def _flush_pending(self):
+        headers = list(dict.fromkeys(k for page in self._pending for it in page for k in it.keys()))
+        self._open(headers or list(self.default_headers))
+        for page in self._pending:
+            self._write(page)
+        self._pending = []
+
+    def write_page(self, items):
+        if not items:
+            return
+        if self._writer is None:
+            self._pending.append(items)
+            if len(self._pending) >= PARQUET_SCHEMA_PAGES:
+                self._flush_pending()
+            return
+        self._write(items)
+
+    def close(self):
+        if self._writer is None:
+            self._flush_pending()  # short task, or empty: header-only file
+        self._writer.close()
+
+
+# Arrow types for /export?format=parquet, following the jobs columns in
+# schema.sql. Anything not listed is a string column.
+JOB_ARROW_TYPES = {
+    "id": "int64",
+    "post_time": "timestamp",
+    "valid_through": "timestamp",
+    "min_pay": "decimal",
+    "max_pay": "decimal",
+}
+EXPORT_BATCH_ROWS = max(1, int(os.getenv("PARQUET_EXPORT_BATCH_ROWS", 50000)))
+_CENTS = Decimal("0.01")
+
+
+def _timestamp(v):
+    # MySQL returns datetimes; SQLite returns whatever text was stored
+    if v is None or isinstance(v, datetime):
+        return v
+    try:
+        return datetime.fromisoformat(str(v).strip().replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _decimal(v):
+    if v is None or v == "":
+        return None
+    try:
+        return Decimal(str(v)).quantize(_CENTS)
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _int(v):
+    return None if v is None else int(v)
+
+
+_CONVERT = {"int64": _int, "timestamp": _timestamp, "decimal": _decimal, "string": _cell}
+
+
+class JobsParquetWriter:
+    """
+    Writes jobs rows (dicts from the DB) to `sink` with a fixed schema built from
+    the column types (JOB_ARROW_TYPES), one row group per write_rows() call.
+    Values that don't fit their column (e.g. unparseable dates stored by SQLite)
+    are written as null.
+    """
+    batch_rows = EXPORT_BATCH_ROWS
+
+    def __init__(self, sink, columns):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        arrow = {"int64": pa.int64(), "timestamp": pa.timestamp("s"),
+                 "decimal": pa.decimal128(15, 2), "string": pa.string()}
+        self.kinds = {c: JOB_ARROW_TYPES.get(c, "string") for c in columns}
+        self.schema = pa.schema([(c, arrow[k]) for c, k in self.kinds.items()])
+        self.rows = 0
+        self._writer = pq.ParquetWriter(sink, self.schema, compression=PARQUET_COMPRESSION)
+
+    def write_rows(self, rows):
+        import pyarrow as pa
+        if not rows:
+            return
+        columns = {c: [_CONVERT[k](r.get(c)) for r in rows] for c, k in self.kinds.items()}
+        self._writer.write_table(pa.Table.from_pydict(columns, schema=self.schema))
+        self.rows += len(rows)
+
+    def close(self):
+        self._writer.close()  # with no rows written this is a valid, empty file
+
+
+# --- Snapshots ---
+def new_snapshot(task_group_id):
+    # random suffix: two runs of one group within the same second get separate snapshots
+    ts = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+    snapshot_id = re.sub(r"[^\w.-]", "_", f"{task_group_id}_{ts}_{uuid.uuid4().hex[:8]}")
+    path = os.path.join(SNAPSHOT_DIR, snapshot_id)
+    os.makedirs(path)
+    return snapshot_id, path
+
+
+def write_manifest(path, manifest):
+    with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def snapshot_path(snapshot_id):
+    """Directory of an existing snapshot, or None (also rejects path tricks in the id)."""
+    if not _SNAPSHOT_ID.match(snapshot_id or ""):
+        return None
+    path = os.path.join(SNAPSHOT_DIR, snapshot_id)
+    return path if os.path.isfile(os.path.join(path, "manifest.json")) else None
+
+
+def read_manifest(snapshot_id):
+    path = snapshot_path(snapshot_id)
+    if not path:
+        return None
+    with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def list_snapshots():
+    """Manifests of all saved snapshots, newest first (by created_at)."""
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return []
+    out = []
+    for name in os.listdir(SNAPSHOT_DIR):
+        m = read_manifest(name)
+        if m:
+            out.append(m)
+    out.sort(key=lambda m: m.get("created_at") or "", reverse=True)
+    return out
+
+
+def read_task_rows(snapshot_id, file_name, offset=0, size=None):
+    """
+    Rows of one task file in a snapshot as dicts (optionally one offset/size page).
+    Only the row groups that overlap the page are read from disk.
+    """
+    import pyarrow.parquet as pq
+    pf = pq.ParquetFile(os.path.join(snapshot_path(snapshot_id), file_name))
+    end = pf.metadata.num_rows if size is None else offset + size
+    groups, first_row, start = [], None, 0
+    for i in range(pf.num_row_groups):
+        n = pf.metadata.row_group(i).num_rows
+        if start < end and start + n > offset:
+            groups.append(i)
+            if first_row is None:
+                first_row = start
+        start += n
+    if not groups:
+        return []
+    table = pf.read_row_groups(groups)
+    return table.slice(offset - first_row, end - offset).to_pylist()
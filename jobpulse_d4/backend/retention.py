@@ -0,0 +1,174 @@
+"""
+Retention for the jobs table.
+
+`jobs` holds the hot set that /search scans by default. A retention pass:
+  1. (MySQL) makes sure jobs_archive has monthly partitions up to next month,
+  2. moves cold rows (valid_through in the past, or post_time older than
+     RETENTION_HOT_DAYS; rows without a post_time age on last_seen, the time
+     an ingest last saw them) from jobs into jobs_archive in batches,
+  3. drops archive months older than RETENTION_ARCHIVE_MONTHS
+     (DROP PARTITION on MySQL, ranged DELETE on SQLite).
+
+Run it from cron (`python retention.py`) or set RETENTION_INTERVAL_HOURS to let
+app.py run it on a background thread.
+"""
+import os
+import re
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import db
+
+HOT_DAYS = int(os.getenv("RETENTION_HOT_DAYS", 90))
+ARCHIVE_MONTHS = int(os.getenv("RETENTION_ARCHIVE_MONTHS", 12))
+BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", 5000))
+
+ARCHIVE_COLUMNS = ("id",) + db.JOB_COLUMNS + ("last_seen",)
+
+
+def _month_start(d, delta=0):
+    """First day of d's month shifted by `delta` months."""
+    m = d.year * 12 + (d.month - 1) + delta
+    return date(m // 12, m % 12 + 1, 1)
+
+
+def _fmt(dt):
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+# --- MySQL partition maintenance ---
+def _archive_partitions(cur):
+    cur.execute(
+        "SELECT PARTITION_NAME AS name FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'jobs_archive' AND PARTITION_NAME IS NOT NULL"
+    )
+    months = []
+    for r in cur.fetchall():
+        m = re.fullmatch(r"p(\d{4})(\d{2})", r["name"])
+        if m:
+            months.append(date(int(m.group(1)), int(m.group(2)), 1))
+    return sorted(months)
+
+
+def ensure_partitions(cur, today):
+    """Splits p_future so there is one partition per month through next month."""
+    existing = _archive_partitions(cur)
+    first = _month_start(today, -ARCHIVE_MONTHS)
+    last = _month_start(today, 1)
+    if existing:
+        first = max(first, _month_start(existing[-1], 1))
+
+    parts = []
+    m = first
+    while m <= last:
+        upper = _month_start(m, 1)
+        parts.append(f"PARTITION p{m:%Y%m} VALUES LESS THAN (TO_DAYS('{upper:%Y-%m-%d}'))")
+        m = upper
+    if not parts:
+        return []
+
+    parts.append("PARTITION p_future VALUES LESS THAN MAXVALUE")
+    cur.execute("ALTER TABLE jobs_archive REORGANIZE PARTITION p_future INTO (" + ", ".join(parts) + ")")
+    return [p.split()[1] for p in parts[:-1]]
+
+
+def drop_old_partitions(cur, cutoff):
+    """Drops monthly partitions that end on or before `cutoff` (a month start)."""
+    old = [f"p{m:%Y%m}" for m in _archive_partitions(cur) if _month_start(m, 1) <= cutoff]
+    if old:
+        cur.execute("ALTER TABLE jobs_archive DROP PARTITION " + ", ".join(old))
+    return old
+
+
+# --- Moving rows ---
+def move_cold_rows(cur, now):
+    """Moves expired/old rows from jobs into jobs_archive; returns the count moved."""
+    hot_cutoff = _fmt(now - timedelta(days=HOT_DAYS))
+    cols = ", ".join(ARCHIVE_COLUMNS)
+    moved = 0
+    while True:
+        cur.execute(
+            "SELECT id FROM jobs "
+            "WHERE (valid_through IS NOT NULL AND valid_through < %s) "
+            "   OR (post_time IS NOT NULL AND post_time < %s) "
+            "   OR (post_time IS NULL AND last_seen < %s) "
+            "LIMIT %s",
+            (_fmt(now), hot_cutoff, hot_cutoff, BATCH_SIZE),
+        )
+        ids = [r["id"] for r in cur.fetchall()]
+        if not ids:
+            return moved
+
+        marks = ",".join(["%s"] * len(ids))
+        cur.execute("BEGIN" if db.is_sqlite() else "START TRANSACTION")
+        try:
+            # A re-scraped posting comes back into jobs as a new row; replace its
+            # older archived copy instead of archiving one more duplicate.
+            cur.execute(
+                f"DELETE FROM jobs_archive WHERE job_link IN "
+                f"(SELECT job_link FROM jobs WHERE id IN ({marks}) AND job_link IS NOT NULL)",
+                ids,
+            )
+            cur.execute(f"INSERT INTO jobs_archive ({cols}) SELECT {cols} FROM jobs WHERE id IN ({marks})", ids)
+            cur.execute(f"DELETE FROM jobs WHERE id IN ({marks})", ids)
+        except Exception:
+            cur.execute("ROLLBACK")
+            raise
+        cur.execute("COMMIT")
+        moved += len(ids)
+
+
+def run_retention(now=None):
+    """One full retention pass. Returns a summary dict."""
+    now = now or datetime.utcnow()
+    archive_cutoff = _month_start(now.date(), -ARCHIVE_MONTHS)
+    summary = {"hot_days": HOT_DAYS, "archive_months": ARCHIVE_MONTHS,
+               "archive_cutoff": archive_cutoff.isoformat()}
+
+    conn = db.get_conn()
+    try:
+        with conn.cursor() as cur:
+            if not db.is_sqlite():
+                summary["partitions_added"] = ensure_partitions(cur, now.date())
+            summary["moved"] = move_cold_rows(cur, now)
+
+            if db.is_sqlite():
+                cur.execute("DELETE FROM jobs_archive WHERE post_time < %s", (archive_cutoff.isoformat(),))
+                summary["archive_deleted"] = cur.rowcount
+            else:
+                summary["partitions_dropped"] = drop_old_partitions(cur, archive_cutoff)
+
+            # Expired postings with no post_time never age out of a month partition.
+            cur.execute(
+                "DELETE FROM jobs_archive WHERE post_time IS NULL AND archived_at < %s",
+                (archive_cutoff.isoformat(),),
+            )
+            summary["undated_deleted"] = cur.rowcount
+    finally:
+        conn.close()
+    return summary
+
+
+def start_scheduler(interval_hours):
+    """Runs run_retention() every `interval_hours` on a daemon thread."""
+    def loop():
+        while True:
+            try:
+                print("RETENTION:", run_retention())
+            except Exception as e:
+                print("RETENTION ERROR:", e)
+            time.sleep(interval_hours * 3600)
+
+    t = threading.Thread(target=loop, name="retention", daemon=True)
+    t.start()
+    return t
+
+
+if __name__ == "__main__":
+    print(run_retention(), file=sys.stderr)
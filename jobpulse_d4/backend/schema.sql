@@ -7,6 +7,7 @@ USE jobpulse;
 
 SET FOREIGN_KEY_CHECKS = 0;
 
+DROP TABLE IF EXISTS jobs_archive;
 DROP TABLE IF EXISTS jobs;
 DROP TABLE IF EXISTS sessions;
 DROP TABLE IF EXISTS users;
@@ -50,6 +51,7 @@ CREATE TABLE jobs (
   hiring_person VARCHAR(255),
   min_pay DECIMAL(15,2),
   max_pay DECIMAL(15,2),
+  last_seen DATETIME DEFAULT CURRENT_TIMESTAMP,  -- last ingest that saw this posting
   UNIQUE KEY uq_jobs_job_link (job_link)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
@@ -58,5 +60,45 @@ CREATE INDEX idx_jobs_title ON jobs (job_title);
 CREATE INDEX idx_jobs_location ON jobs (job_location);
 CREATE INDEX idx_jobs_post_time ON jobs (post_time);
 CREATE INDEX idx_jobs_company ON jobs (company);
+CREATE INDEX idx_jobs_valid_through ON jobs (valid_through);
+CREATE INDEX idx_jobs_last_seen ON jobs (last_seen);
+-- Upgrading an existing database:
+--   ALTER TABLE jobs ADD COLUMN last_seen DATETIME DEFAULT CURRENT_TIMESTAMP, ADD INDEX idx_jobs_last_seen (last_seen);
+--   ALTER TABLE jobs_archive ADD COLUMN last_seen DATETIME;
+
+-- Cold postings moved out of jobs by retention.py (expired, or older than
+-- RETENTION_HOT_DAYS). Range-partitioned by month on post_time so whole months
+-- are dropped with DROP PARTITION; retention.py adds the monthly partitions by
+-- splitting p_future. p0 only holds rows with a NULL post_time.
+-- Partitioned tables can't carry the job_link unique key, so archive rows are
+-- plain copies (original id kept) and upserts only ever touch jobs.
+CREATE TABLE jobs_archive (
+  id BIGINT UNSIGNED NOT NULL,
+  job_title VARCHAR(255) NOT NULL,
+  job_link VARCHAR(500),
+  company VARCHAR(255),
+  company_link VARCHAR(500),
+  job_location VARCHAR(255),
+  post_time DATETIME,
+  applicant_count VARCHAR(100),
+  job_description TEXT,
+  industry VARCHAR(255),
+  employment_type VARCHAR(100),
+  valid_through DATETIME,
+  seniority_level VARCHAR(100),
+  job_function VARCHAR(255),
+  hiring_person VARCHAR(255),
+  min_pay DECIMAL(15,2),
+  max_pay DECIMAL(15,2),
+  last_seen DATETIME,
+  archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  KEY idx_jobs_archive_id (id),
+  KEY idx_jobs_archive_post_time (post_time),
+  KEY idx_jobs_archive_job_link (job_link)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+PARTITION BY RANGE (TO_DAYS(post_time)) (
+  PARTITION p0 VALUES LESS THAN (1),
+  PARTITION p_future VALUES LESS THAN MAXVALUE
+);
 
 SET FOREIGN_KEY_CHECKS = 1;
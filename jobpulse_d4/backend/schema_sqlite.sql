@@ -0,0 +1,114 @@
+-- ===========================
+-- JobPulse Schema (embedded SQLite backend, DB_BACKEND=sqlite)
+-- Mirrors schema.sql; applied idempotently by db.get_conn().
+-- ===========================
+
+CREATE TABLE IF NOT EXISTS users (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  email TEXT NOT NULL UNIQUE,
+  password_hash TEXT NOT NULL,
+  full_name TEXT,
+  role TEXT DEFAULT 'viewer' CHECK (role IN ('viewer','analyst','admin')),
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  last_login DATETIME,
+  is_active INTEGER DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS sessions (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  session_token TEXT NOT NULL UNIQUE,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  expires_at DATETIME,
+  last_seen DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS jobs (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  job_title TEXT NOT NULL,
+  job_link TEXT,
+  company TEXT,
+  company_link TEXT,
+  job_location TEXT,
+  post_time DATETIME,
+  applicant_count TEXT,
+  job_description TEXT,
+  industry TEXT,
+  employment_type TEXT,
+  valid_through DATETIME,
+  seniority_level TEXT,
+  job_function TEXT,
+  hiring_person TEXT,
+  min_pay NUMERIC,
+  max_pay NUMERIC,
+  last_seen DATETIME DEFAULT CURRENT_TIMESTAMP  -- last ingest that saw this posting
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_jobs_job_link ON jobs (job_link);
+CREATE INDEX IF NOT EXISTS idx_jobs_title ON jobs (job_title);
+CREATE INDEX IF NOT EXISTS idx_jobs_location ON jobs (job_location);
+CREATE INDEX IF NOT EXISTS idx_jobs_post_time ON jobs (post_time);
+CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs (company);
+CREATE INDEX IF NOT EXISTS idx_jobs_valid_through ON jobs (valid_through);
+CREATE INDEX IF NOT EXISTS idx_jobs_last_seen ON jobs (last_seen);
+
+-- Cold postings moved out of jobs by retention.py (no partitions in SQLite;
+-- old months are removed with a ranged DELETE on post_time).
+CREATE TABLE IF NOT EXISTS jobs_archive (
+  id INTEGER NOT NULL,
+  job_title TEXT NOT NULL,
+  job_link TEXT,
+  company TEXT,
+  company_link TEXT,
+  job_location TEXT,
+  post_time DATETIME,
+  applicant_count TEXT,
+  job_description TEXT,
+  industry TEXT,
+  employment_type TEXT,
+  valid_through DATETIME,
+  seniority_level TEXT,
+  job_function TEXT,
+  hiring_person TEXT,
+  min_pay NUMERIC,
+  max_pay NUMERIC,
+  last_seen DATETIME,
+  archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_archive_id ON jobs_archive (id);
+CREATE INDEX IF NOT EXISTS idx_jobs_archive_post_time ON jobs_archive (post_time);
+CREATE INDEX IF NOT EXISTS idx_jobs_archive_job_link ON jobs_archive (job_link);
+
+-- Full-text index over title + description (external content, kept in sync by triggers).
+-- The trigram tokenizer lets FTS5 answer LIKE '%term%' substring queries, so
+-- /search keeps the same matching as the MySQL LIKE filter ("end" finds
+-- "Backend", "C#" and "C++" are not reduced to "C"). Needs SQLite >= 3.34.
+-- An earlier word-tokenized jobs_fts index is replaced by jobs_trgm.
+DROP TRIGGER IF EXISTS jobs_fts_ai;
+DROP TRIGGER IF EXISTS jobs_fts_ad;
+DROP TRIGGER IF EXISTS jobs_fts_au;
+DROP TABLE IF EXISTS jobs_fts;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_trgm USING fts5(
+  job_title, job_description,
+  content='jobs', content_rowid='id',
+  tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS jobs_trgm_ai AFTER INSERT ON jobs BEGIN
+  INSERT INTO jobs_trgm (rowid, job_title, job_description)
+  VALUES (new.id, new.job_title, new.job_description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS jobs_trgm_ad AFTER DELETE ON jobs BEGIN
+  INSERT INTO jobs_trgm (jobs_trgm, rowid, job_title, job_description)
+  VALUES ('delete', old.id, old.job_title, old.job_description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS jobs_trgm_au AFTER UPDATE OF job_title, job_description ON jobs BEGIN
+  INSERT INTO jobs_trgm (jobs_trgm, rowid, job_title, job_description)
+  VALUES ('delete', old.id, old.job_title, old.job_description);
+  INSERT INTO jobs_trgm (rowid, job_title, job_description)
+  VALUES (new.id, new.job_title, new.job_description);
+END;